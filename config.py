@@ -89,6 +89,33 @@ NLP_HIGH_SEVERITY_KEYWORDS = [
 # KB番号抽出のための正規表現 (大文字小文字を区別しない)
 KB_NUMBER_PATTERN = re.compile(r'KB(\d{7,})', re.IGNORECASE)
 
+# Geminiへのプロンプトに含める記事本文の先頭文字数
+GEMINI_PROMPT_CONTENT_LENGTH = 500
+
+# ==============================================================================
+# 記事リビジョン管理設定
+# ==============================================================================
+# 段落の変更がこれらのキーワードを含む場合、再分析が必要な変更とみなす (小文字で定義)
+# assess_issue_severity_nlp で使用する全キーワードと、記事の追記でよく使われる表現。
+# ポジティブキーワードも近くの不具合キーワードを打ち消すため、スコアリング結果に影響する
+REVISION_RELEVANT_KEYWORDS = sorted(set(
+    NLP_NEGATIVE_KEYWORDS + NLP_HIGH_SEVERITY_KEYWORDS + NLP_POSITIVE_KEYWORDS +
+    ["update:", "confirmed", "acknowledged", "workaround", "known issue"]
+), key=len, reverse=True)
+
+# 単語の先頭でのみ照合する正規表現 ("hang" が "changed" に、"bug" が "debug" に一致しないようにする)
+# 語尾は制限しない (corruption, slowdowns, problematic など、スコアリングが部分一致で検出する語を取りこぼさないため)
+REVISION_RELEVANT_PATTERN = re.compile(
+    r'(?<!\w)(?:' + '|'.join(re.escape(keyword) for keyword in REVISION_RELEVANT_KEYWORDS) + r')',
+    re.IGNORECASE
+)
+
+# 1記事あたりに保持するリビジョン履歴の最大数 (古いものから削除)
+MAX_ARTICLE_REVISIONS = 20
+
+# 出力に含める追加段落のプレビュー文字数
+REVISION_PREVIEW_LENGTH = 200
+
 # ==============================================================================
 # 遅延設定 (サーバーへの負荷軽減のため)
 # ==============================================================================
@@ -5,6 +5,21 @@ import datetime
 import config
 import scraper
 import nlp_analyzer
+import revision_tracker
+
+def save_cached_articles(cached_articles):
+    """
+    キャッシュされた記事データをファイルに保存する。
+    Args:
+        cached_articles (dict): URLをキーとする記事データの辞書。
+    """
+    try:
+        with open(config.CACHED_REMOTE_JSON_FILE_PATH, 'w', encoding='utf-8') as f:
+            # リスト形式で保存
+            json.dump(list(cached_articles.values()), f, ensure_ascii=False, indent=4)
+        print(f"[{datetime.datetime.now()}] Cached {len(cached_articles)} articles to {config.CACHED_REMOTE_JSON_FILE_PATH}")
+    except Exception as e:
+        print(f"[{datetime.datetime.now()}] Error saving cached articles: {e}")
 
 def main():
     print("[{}] Starting Windows Latest issue scraper...".format(datetime.datetime.now()))
@@ -75,13 +90,8 @@ def main():
             print(f"[{current_time}] Skipping duplicate URL in current run: {article_url_cleaned}")
             continue
 
-        # キャッシュに存在し、かつ今回の実行で更新がない場合はスキップ
-        # (scraper.filter_relevant_articlesでlast_check_timeに基づいてフィルタリングしているため、
-        # ここでは基本的には新規または更新された記事が来るはずですが、念のため)
-        if article_url_cleaned in cached_articles:
-            # ここではURLが既に存在することを確認するだけで、コンテンツのハッシュ比較などは行わない
-            # scraperがタイムスタンプベースでフィルタリングしているので、基本的に不要
-            pass
+        # キャッシュ済みの記事も記事中の追記 ("Update: ..." など) を検出するため再取得し、
+        # revision_trackerで段落単位の差分を取って再分析の要否を判定する
         
         print("[{}] Processing article {}/{}: {} ({})".format(current_time, i+1, len(relevant_articles), article['title'], article_url_cleaned))
 
@@ -94,6 +104,14 @@ def main():
                 "article_url": article_url_cleaned,
                 "content": article_content
             }
+            # 段落単位の差分からリビジョンを記録し、再分析が必要かを判定
+            previous_revisions = cached_articles.get(article_url_cleaned, {}).get('revisions', [])
+            article_data = revision_tracker.record_revision(cached_articles.get(article_url_cleaned), article_data)
+            latest_revision = article_data['revisions'][-1]
+            if previous_revisions and latest_revision['revision'] != previous_revisions[-1]['revision']:
+                print("[{}] Article updated to revision {} (+{}/-{} paragraphs, relevant change: {})".format(
+                    current_time, latest_revision['revision'], latest_revision['added_paragraphs'],
+                    latest_revision['removed_paragraphs'], latest_revision['relevant_change']))
             processed_articles_data.append(article_data)
             urls_processed_in_this_run.add(article_url_cleaned) # 処理済みとしてマーク
         else:
@@ -107,13 +125,7 @@ def main():
 
     # キャッシュをファイルに保存
     if cached_articles:
-        try:
-            with open(config.CACHED_REMOTE_JSON_FILE_PATH, 'w', encoding='utf-8') as f:
-                # リスト形式で保存
-                json.dump(list(cached_articles.values()), f, ensure_ascii=False, indent=4)
-            print(f"[{datetime.datetime.now()}] Cached {len(cached_articles)} articles to {config.CACHED_REMOTE_JSON_FILE_PATH}")
-        except Exception as e:
-            print(f"[{datetime.datetime.now()}] Error saving cached articles: {e}")
+        save_cached_articles(cached_articles)
 
     # 5. NLPアナライザーで記事を処理し、JSONに出力
     # ここではcached_articlesのデータ（全てのスキャン対象記事）を渡す
@@ -121,7 +133,14 @@ def main():
         print(f"[{datetime.datetime.now()}] Analyzing {len(cached_articles)} articles with NLP...")
         # nlp_analyzerは既存のJSONを読み込み、新しいデータをマージするロジックを持つため、
         # ここでは cached_articles の内容を渡すのが適切
-        nlp_analyzer.process_and_save_issue_data_nlp(list(cached_articles.values()))
+        # 関連する変更のない記事は nlp_analyzer 側で再分析をスキップする
+        analyzed_urls = nlp_analyzer.process_and_save_issue_data_nlp(list(cached_articles.values()))
+
+        # 分析が完了した記事のみ再分析フラグを解除してキャッシュを更新
+        # (Gemini APIエラーなどで分析できなかった記事は次回の実行で再分析する)
+        for article_url in analyzed_urls:
+            cached_articles[article_url]['needs_analysis'] = False
+        save_cached_articles(cached_articles)
     else:
         print(f"[{datetime.datetime.now()}] No articles to analyze.")
 
@@ -139,7 +139,8 @@ def ask_gemini_about_severity(article_title, article_content, kb_numbers, detect
         kb_numbers (list): 検出されたKB番号のリスト
         detected_keywords (list): 検出されたキーワードのリスト
     Returns:
-        str: 重大な不具合に関するものならTrue, そうでなければFalse
+        bool: 重大な不具合に関するものならTrue, そうでなければFalse。
+              API呼び出しに失敗した場合は、「いいえ」と区別するためNoneを返す。
     """
     if not model:
         return False
@@ -160,7 +161,7 @@ def ask_gemini_about_severity(article_title, article_content, kb_numbers, detect
     関連キーワードとして: {', '.join(detected_keywords) if detected_keywords else 'なし'} が検出されています。
 
     記事のタイトル: "{article_title}"
-    記事の本文の冒頭: "{article_content[:500]}..."
+    記事の本文の冒頭: "{article_content[:config.GEMINI_PROMPT_CONTENT_LENGTH]}..."
 
     この記事は「重大な不具合に関するもの」である場合のみ「はい」と答えてください。それ以外の場合は「いいえ」と答えてください。
     回答は「はい」または「いいえ」のみにしてください。
@@ -174,15 +175,18 @@ def ask_gemini_about_severity(article_title, article_content, kb_numbers, detect
     
     except Exception as e:
         print(f"Gemini API呼び出しエラー: {e}")
-        # APIエラー時はGeminiによる判定をスキップし、Falseを返すなどのフォールバックを検討
-        return False
+        # APIエラー時は判定不能としてNoneを返し、次回の実行で再分析させる
+        return None
 
 def process_and_save_issue_data_nlp(articles):
     """
     収集した記事データをNLPで分析し、不具合情報をJSONファイルに保存する。
     過去の不具合情報も保持するようにマージする。
     Args:
-        articles (list): 記事情報 (title, url, content) の辞書リスト。
+        articles (list): 記事情報 (title, url, content, revisions, needs_analysis) の辞書リスト。
+                         needs_analysis が False の記事は再分析せず、リビジョン履歴のみ更新する。
+    Returns:
+        set: 今回分析が完了した記事のURL (Gemini API呼び出しに失敗した記事は含まない)。
     """
     output_dir = config.OUTPUT_DIR # configからOUTPUT_DIRを取得
     output_file_path = config.OUTPUT_FILE_PATH # configからOUTPUT_FILE_PATHを取得
@@ -205,16 +209,27 @@ def process_and_save_issue_data_nlp(articles):
             existing_data = {} # 無効なJSONの場合は空にする
 
     issues_found_this_run = 0
+    articles_skipped_unchanged = 0
+    analyzed_urls = set()
     
     for article in articles:
         article_title = article.get('article_title', '')
         article_url = article.get('article_url', '')
         article_content = article.get('content', '')
+        revisions = article.get('revisions', [])
 
         if not article_content:
             print(f"Skipping article due to empty content: {article_title}")
             continue
 
+        # 前回の分析以降、分析結果に影響する変更がない記事は再分析しない
+        # (リビジョン履歴のみ出力に反映する)
+        if not article.get('needs_analysis', True):
+            if article_url in existing_data:
+                existing_data[article_url]['revisions'] = revisions
+            articles_skipped_unchanged += 1
+            continue
+
         # 1. 簡易NLPによる重大度判定（KB検出を含む）
         severity, detected_keywords, kb_numbers, sentiment_polarity = \
             assess_issue_severity_nlp(article_title, article_content)
@@ -223,6 +238,9 @@ def process_and_save_issue_data_nlp(articles):
         # GeminiにAPIコールする前に、ある程度絞り込む
         if not kb_numbers and severity == "low":
             # KB番号がなく、かつNLPが既に「low」と判断した場合は、Geminiに聞かずにスキップ
+            if article_url in existing_data:
+                existing_data[article_url]['revisions'] = revisions
+            analyzed_urls.add(article_url)
             continue
         
         # 3. Geminiによる最終判別（KB番号があるか、またはNLPでmedium/highと判定された記事のみ）
@@ -231,6 +249,10 @@ def process_and_save_issue_data_nlp(articles):
             is_truly_critical_issue = ask_gemini_about_severity(
                 article_title, article_content, kb_numbers, detected_keywords
             )
+            if is_truly_critical_issue is None:
+                # API呼び出しに失敗した場合は分析未完了として扱い、既存の出力もそのまま保持する
+                print(f"Gemini判定に失敗したため、次回の実行で再分析します: {article_title}")
+                continue
         else:
             # Geminiが利用できない場合、NLPのseverityに頼る
             # ここでは、KBがあるか、NLPがmedium/highと判断したら含めるようにする
@@ -248,10 +270,15 @@ def process_and_save_issue_data_nlp(articles):
                 "severity": "high", 
                 "detected_keywords": detected_keywords,
                 "sentiment_polarity": sentiment_polarity,
-                "content_preview": article_content[:200] + "..." if len(article_content) > 200 else article_content
+                "content_preview": article_content[:200] + "..." if len(article_content) > 200 else article_content,
+                "revisions": revisions
             }
             existing_data[article_url] = output_entry # URLをキーとしてデータを更新または追加
             issues_found_this_run += 1
+        elif article_url in existing_data:
+            # 過去に不具合として保存済みの記事は保持し、リビジョン履歴のみ更新する
+            existing_data[article_url]['revisions'] = revisions
+        analyzed_urls.add(article_url)
 
     # マージされたデータをリストに戻す
     final_output_data = list(existing_data.values())
@@ -259,4 +286,7 @@ def process_and_save_issue_data_nlp(articles):
     with open(output_file_path, 'w', encoding='utf-8') as f:
         json.dump(final_output_data, f, ensure_ascii=False, indent=4)
 
-    print(f"Found {issues_found_this_run} new/updated relevant issues in this run. Total {len(final_output_data)} issues saved to {output_file_path}")
\ No newline at end of file
+    print(f"Skipped re-analysis of {articles_skipped_unchanged} articles without relevant changes.")
+    print(f"Found {issues_found_this_run} new/updated relevant issues in this run. Total {len(final_output_data)} issues saved to {output_file_path}")
+
+    return analyzed_urls
\ No newline at end of file
@@ -0,0 +1,217 @@
+import hashlib
+import re
+
+import config # config モジュール全体をインポート
+
+def split_paragraphs(content):
+    """
+    記事本文を段落に分割する。
+    extract_article_content は要素ごとに改行で区切ったテキストを返すため、行単位を段落とみなす。
+    Args:
+        content (str): 記事本文。
+    Returns:
+        list: 空白を正規化した段落文字列のリスト (空行は除外)。
+    """
+    paragraphs = []
+    for line in (content or '').split('\n'):
+        normalized = re.sub(r'\s+', ' ', line).strip()
+        if normalized:
+            paragraphs.append(normalized)
+    return paragraphs
+
+def hash_text(text):
+    """
+    テキストのハッシュ値を計算する。
+    Args:
+        text (str): ハッシュ化するテキスト。
+    Returns:
+        str: SHA-256 の先頭16桁 (キャッシュサイズを抑えるため短縮)。
+    """
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()[:16]
+
+def is_relevant_paragraph(paragraph):
+    """
+    段落がキーワードスコアリングや分類の結果に影響し得るかを判定する。
+    Args:
+        paragraph (str): 判定対象の段落。
+    Returns:
+        bool: 関連キーワードまたはKB番号を含む場合True。
+    """
+    if config.KB_NUMBER_PATTERN.search(paragraph):
+        return True
+    return config.REVISION_RELEVANT_PATTERN.search(paragraph) is not None
+
+def normalize_excerpt(text):
+    """
+    Gemini に渡す本文冒頭を比較するため、記事本文を正規化する (空白の違いを無視する)。
+    Args:
+        text (str): 記事本文。
+    Returns:
+        str: 連続する空白を1つにまとめたテキスト。
+    """
+    return re.sub(r'\s+', ' ', text).strip()
+
+def normalize_title(title):
+    """
+    記事タイトルを比較用に正規化する。
+    メインページのリンクテキストは末尾が省略 ("…") されることがあるため、省略記号を取り除く。
+    Args:
+        title (str): 記事タイトル。
+    Returns:
+        tuple: (正規化したタイトル, 省略されていた場合True)
+    """
+    normalized = re.sub(r'\s+', ' ', title or '').strip()
+    truncated = normalized.endswith('…') or normalized.endswith('...')
+    normalized = normalized.rstrip('….').strip().lower()
+    return normalized, truncated
+
+def is_title_changed(previous_title, current_title):
+    """
+    記事タイトルが変更されたかを判定する。省略位置の違いのみの場合は変更とみなさない。
+    Args:
+        previous_title (str): 前回のタイトル。
+        current_title (str): 今回のタイトル。
+    Returns:
+        bool: タイトルが変更された場合True。
+    """
+    previous_normalized, previous_truncated = normalize_title(previous_title)
+    current_normalized, current_truncated = normalize_title(current_title)
+    if previous_normalized == current_normalized:
+        return False
+    # 省略されたタイトルは、もう一方のタイトルの先頭部分と一致すれば同一とみなす
+    if previous_truncated and current_normalized.startswith(previous_normalized):
+        return False
+    if current_truncated and previous_normalized.startswith(current_normalized):
+        return False
+    return True
+
+def diff_paragraphs(previous_hashes, current_paragraphs, previous_content=''):
+    """
+    保存済みの段落ハッシュと今回の段落を比較し、追加・削除された段落を求める (段落の並べ替えは変更とみなさない)。
+    削除された段落の本文は、削除があった場合のみ previous_content から復元する。
+    Args:
+        previous_hashes (list): 前回リビジョンの段落ハッシュリスト。
+        current_paragraphs (list): 今回取得した段落リスト。
+        previous_content (str): 前回リビジョンの記事本文。
+    Returns:
+        tuple: (added_paragraphs, removed_paragraphs)
+    """
+    previous_hash_set = set(previous_hashes)
+    current_hashes = [hash_text(p) for p in current_paragraphs]
+    added = [p for p, h in zip(current_paragraphs, current_hashes) if h not in previous_hash_set]
+
+    removed_hashes = previous_hash_set - set(current_hashes)
+    removed = []
+    if removed_hashes:
+        removed = [p for p in split_paragraphs(previous_content) if hash_text(p) in removed_hashes]
+    return added, removed
+
+def compute_content_hash(paragraph_hashes):
+    """
+    段落ハッシュから記事本文全体のハッシュ値を計算する。
+    段落の並べ替えを変更とみなさないよう、ソートした段落ハッシュから求める。
+    Args:
+        paragraph_hashes (list): 段落ハッシュのリスト。
+    Returns:
+        str: 本文全体のハッシュ値。
+    """
+    return hash_text('\n'.join(sorted(set(paragraph_hashes))))
+
+def build_initial_revision(paragraphs, timestamp, title):
+    """
+    記事の初版リビジョンを作成する。
+    Args:
+        paragraphs (list): 初版の段落リスト。
+        timestamp (str): 取得時刻 (ISO形式)。
+        title (str): 記事タイトル。
+    Returns:
+        dict: リビジョン情報。
+    """
+    return {
+        "revision": 1,
+        "timestamp": timestamp,
+        "title": title,
+        "title_changed": False,
+        "excerpt_changed": False,
+        "content_hash": compute_content_hash([hash_text(p) for p in paragraphs]),
+        "paragraph_count": len(paragraphs),
+        "added_paragraphs": len(paragraphs),
+        "removed_paragraphs": 0,
+        "relevant_change": True,
+        "added_relevant_preview": []
+    }
+
+def record_revision(previous_entry, article_data):
+    """
+    今回取得した記事本文を前回のキャッシュエントリと比較し、リビジョン履歴を更新する。
+    本文に変更がなければ新しいリビジョンは作成しない。
+    Args:
+        previous_entry (dict): キャッシュ済みの記事データ (新規記事の場合はNone)。
+        article_data (dict): 今回取得した記事データ (timestamp, article_title, article_url, content)。
+    Returns:
+        dict: paragraph_hashes, revisions, needs_analysis を追加した記事データ。
+    """
+    paragraphs = split_paragraphs(article_data['content'])
+    paragraph_hashes = [hash_text(p) for p in paragraphs]
+    content_hash = compute_content_hash(paragraph_hashes)
+
+    previous_entry = previous_entry or {}
+    revisions = list(previous_entry.get('revisions', []))
+    previous_content = previous_entry.get('content')
+
+    # リビジョン管理導入前のキャッシュエントリは、その本文を初版として扱う
+    if previous_content and not revisions:
+        revisions.append(build_initial_revision(
+            split_paragraphs(previous_content), previous_entry.get('timestamp', ''), previous_entry.get('article_title', '')
+        ))
+
+    # 未分析のリビジョンが残っている場合はフラグを引き継ぐ (旧形式のエントリは再分析する)
+    needs_analysis = previous_entry.get('needs_analysis', True)
+    title_changed = is_title_changed(previous_entry.get('article_title'), article_data['article_title'])
+
+    # Gemini に渡す本文冒頭は、段落の並べ替えのみでも変わり得るため段落の差分とは別に比較する
+    # (空白のみの違いは判定結果に影響しないため正規化して比較)
+    excerpt_length = config.GEMINI_PROMPT_CONTENT_LENGTH
+    excerpt_changed = bool(previous_content) and \
+        normalize_excerpt(previous_content)[:excerpt_length] != normalize_excerpt(article_data['content'])[:excerpt_length]
+
+    if not revisions:
+        # 新規記事: 初版として記録し、必ず分析する
+        revisions.append(build_initial_revision(paragraphs, article_data['timestamp'], article_data['article_title']))
+        needs_analysis = True
+    elif revisions[-1]['content_hash'] != content_hash or title_changed or excerpt_changed:
+        # 前回保存した段落ハッシュと比較 (旧形式のエントリは本文から計算する)
+        previous_hashes = previous_entry.get('paragraph_hashes') or \
+            [hash_text(p) for p in split_paragraphs(previous_content)]
+        added, removed = diff_paragraphs(previous_hashes, paragraphs, previous_content)
+        # 本文冒頭に影響しない段落の並べ替えのみの場合は新しいリビジョンを作成しない
+        if added or removed or title_changed or excerpt_changed:
+            relevant_added = [p for p in added if is_relevant_paragraph(p)]
+            relevant_removed = [p for p in removed if is_relevant_paragraph(p)]
+
+            # タイトルや Gemini に渡す本文冒頭が変わった場合も分類結果に影響するため再分析する
+            relevant_change = bool(relevant_added or relevant_removed or title_changed or excerpt_changed)
+
+            preview_length = config.REVISION_PREVIEW_LENGTH
+            revisions.append({
+                "revision": revisions[-1]['revision'] + 1,
+                "timestamp": article_data['timestamp'],
+                "title": article_data['article_title'],
+                "title_changed": title_changed,
+                "excerpt_changed": excerpt_changed,
+                "content_hash": content_hash,
+                "paragraph_count": len(paragraphs),
+                "added_paragraphs": len(added),
+                "removed_paragraphs": len(removed),
+                "relevant_change": relevant_change,
+                "added_relevant_preview": [
+                    p[:preview_length] + "..." if len(p) > preview_length else p
+                    for p in relevant_added
+                ]
+            })
+            needs_analysis = needs_analysis or relevant_change
+
+    article_data['paragraph_hashes'] = paragraph_hashes
+    article_data['revisions'] = revisions[-config.MAX_ARTICLE_REVISIONS:]
+    article_data['needs_analysis'] = needs_analysis
+    return article_data
@@ -0,0 +1,47 @@
+import json
+import os
+
+import pytest
+
+# main は nlp_analyzer を経由して Gemini の設定と spaCy モデルのロードを行う
+pytest.importorskip("bs4")
+pytest.importorskip("google.generativeai")
+pytest.importorskip("textblob")
+pytest.importorskip("en_core_web_sm")
+os.environ.setdefault("GEMINI_API_KEY", "test-key")
+
+import config
+import main
+import nlp_analyzer
+import scraper
+
+ANALYZED_URL = "https://www.windowslatest.com/2025/06/16/analyzed/"
+FAILED_URL = "https://www.windowslatest.com/2025/06/17/gemini-error/"
+
+@pytest.fixture
+def cache_path(tmp_path, monkeypatch):
+    cache_dir = tmp_path / "cache"
+    monkeypatch.setattr(config, "OUTPUT_DIR", str(tmp_path))
+    monkeypatch.setattr(config, "OUTPUT_FILE_PATH", str(tmp_path / "issues.json"))
+    monkeypatch.setattr(config, "CACHE_DIR", str(cache_dir))
+    monkeypatch.setattr(config, "CACHED_REMOTE_JSON_FILE_PATH", str(cache_dir / "cached.json"))
+    monkeypatch.setattr(config, "LAST_CHECK_FILE_PATH", str(cache_dir / "last_check_time.txt"))
+    return cache_dir / "cached.json"
+
+def test_needs_analysis_is_cleared_only_for_analyzed_urls(cache_path, monkeypatch):
+    articles = [
+        {"title": "Windows 11 KB5063060 issues", "url": ANALYZED_URL},
+        {"title": "Windows 11 KB5063061 issues", "url": FAILED_URL},
+    ]
+    monkeypatch.setattr(scraper, "get_html_content", lambda url: "<html></html>")
+    monkeypatch.setattr(scraper, "extract_article_links", lambda html: [])
+    monkeypatch.setattr(scraper, "filter_relevant_articles", lambda links, last_check_time: articles)
+    monkeypatch.setattr(scraper, "extract_article_content", lambda url: "Install fails with error 0x800f0922.")
+    monkeypatch.setattr(scraper, "apply_random_delay", lambda: None)
+    monkeypatch.setattr(nlp_analyzer, "process_and_save_issue_data_nlp", lambda articles: {ANALYZED_URL})
+
+    main.main()
+
+    cached = {entry["article_url"]: entry for entry in json.loads(cache_path.read_text(encoding="utf-8"))}
+    assert cached[ANALYZED_URL]["needs_analysis"] is False
+    assert cached[FAILED_URL]["needs_analysis"] is True
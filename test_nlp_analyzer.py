@@ -0,0 +1,96 @@
+import json
+import os
+
+import pytest
+
+# nlp_analyzer はインポート時に Gemini の設定と spaCy モデルのロードを行う
+pytest.importorskip("google.generativeai")
+pytest.importorskip("textblob")
+pytest.importorskip("en_core_web_sm")
+os.environ.setdefault("GEMINI_API_KEY", "test-key")
+
+import config
+import nlp_analyzer
+
+ARTICLE_URL = "https://www.windowslatest.com/2025/06/16/windows-11-kb5063060-issues/"
+
+def make_article(needs_analysis=True, revisions=None):
+    return {
+        "timestamp": "2025-06-25T09:00:00",
+        "article_title": "Windows 11 KB5063060 issues, install fails for some users",
+        "article_url": ARTICLE_URL,
+        "content": "Windows 11 KB5063060 is failing to install with error 0x800f0922.",
+        "revisions": revisions or [{"revision": 1}],
+        "needs_analysis": needs_analysis,
+    }
+
+@pytest.fixture
+def output_path(tmp_path, monkeypatch):
+    path = tmp_path / "issues.json"
+    monkeypatch.setattr(config, "OUTPUT_DIR", str(tmp_path))
+    monkeypatch.setattr(config, "OUTPUT_FILE_PATH", str(path))
+    monkeypatch.setattr(nlp_analyzer, "model", object())
+    return path
+
+def write_existing_issue(path):
+    existing = {
+        "timestamp": "2025-06-20T09:00:00",
+        "article_title": "Windows 11 KB5063060 issues",
+        "article_url": ARTICLE_URL,
+        "kb_numbers": ["5063060"],
+        "severity": "high",
+        "detected_keywords": ["fail"],
+        "sentiment_polarity": 0.0,
+        "content_preview": "old preview",
+        "revisions": [{"revision": 1}],
+    }
+    path.write_text(json.dumps([existing]), encoding="utf-8")
+    return existing
+
+def read_output(path):
+    return {entry["article_url"]: entry for entry in json.loads(path.read_text(encoding="utf-8"))}
+
+def test_ask_gemini_returns_none_on_api_error(monkeypatch):
+    class FailingModel:
+        def generate_content(self, prompt):
+            raise RuntimeError("quota exceeded")
+
+    monkeypatch.setattr(nlp_analyzer, "model", FailingModel())
+    assert nlp_analyzer.ask_gemini_about_severity("title", "content", [], []) is None
+
+def test_failed_gemini_call_is_not_marked_analyzed(output_path, monkeypatch):
+    existing = write_existing_issue(output_path)
+    monkeypatch.setattr(nlp_analyzer, "ask_gemini_about_severity", lambda *args: None)
+
+    analyzed_urls = nlp_analyzer.process_and_save_issue_data_nlp(
+        [make_article(revisions=[{"revision": 1}, {"revision": 2}])]
+    )
+
+    assert ARTICLE_URL not in analyzed_urls
+    assert read_output(output_path)[ARTICLE_URL] == existing
+
+def test_gemini_answers_mark_article_analyzed(output_path, monkeypatch):
+    monkeypatch.setattr(nlp_analyzer, "ask_gemini_about_severity", lambda *args: False)
+    assert nlp_analyzer.process_and_save_issue_data_nlp([make_article()]) == {ARTICLE_URL}
+    assert read_output(output_path) == {}
+
+    revisions = [{"revision": 1}, {"revision": 2}]
+    monkeypatch.setattr(nlp_analyzer, "ask_gemini_about_severity", lambda *args: True)
+    assert nlp_analyzer.process_and_save_issue_data_nlp([make_article(revisions=revisions)]) == {ARTICLE_URL}
+    assert read_output(output_path)[ARTICLE_URL]["revisions"] == revisions
+
+def test_article_without_relevant_changes_only_updates_revisions(output_path, monkeypatch):
+    existing = write_existing_issue(output_path)
+
+    def unexpected_call(*args):
+        raise AssertionError("Gemini should not be called for unchanged articles")
+
+    monkeypatch.setattr(nlp_analyzer, "ask_gemini_about_severity", unexpected_call)
+    revisions = [{"revision": 1}, {"revision": 2, "relevant_change": False}]
+
+    analyzed_urls = nlp_analyzer.process_and_save_issue_data_nlp(
+        [make_article(needs_analysis=False, revisions=revisions)]
+    )
+
+    assert analyzed_urls == set()
+    assert read_output(output_path)[ARTICLE_URL] == dict(existing, revisions=revisions)
@@ -0,0 +1,127 @@
+import config
+import revision_tracker
+
+BASE_CONTENT = "\n".join([
+    "Windows 11 KB5063060 is failing to install for some users.",
+    "The update is rolling out via Windows Update.",
+    "We tested it on several machines.",
+    # Gemini に渡す本文冒頭より後ろへの追記を検証するため、冒頭部分を十分な長さにする
+    "Windows Latest has been following this release closely. " * 10,
+])
+
+def make_article(content, title="Windows 11 KB5063060 issues", timestamp="2025-06-25T09:00:00"):
+    return {
+        "timestamp": timestamp,
+        "article_title": title,
+        "article_url": "https://www.windowslatest.com/2025/06/16/example/",
+        "content": content,
+    }
+
+def analyzed(entry):
+    entry['needs_analysis'] = False
+    return entry
+
+def test_is_relevant_paragraph_requires_word_start():
+    assert not revision_tracker.is_relevant_paragraph("The layout changed")
+    assert not revision_tracker.is_relevant_paragraph("We used a debug prefix to dispatch it")
+    assert revision_tracker.is_relevant_paragraph("The update failed on some devices")
+    assert revision_tracker.is_relevant_paragraph("Update: Microsoft confirmed the bug.")
+    assert revision_tracker.is_relevant_paragraph("KB5063060 is now available")
+
+def test_is_relevant_paragraph_matches_keyword_prefixes_like_the_scorer():
+    assert revision_tracker.is_relevant_paragraph("Users are reporting slowdowns and file corruption after installing it.")
+    assert revision_tracker.is_relevant_paragraph("Some PCs are freezing and the update is problematic.")
+    assert revision_tracker.is_relevant_paragraph("Microsoft says the driver throws errors on boot.")
+    assert revision_tracker.is_relevant_paragraph("The feature has been improved in this build.")
+
+def test_diff_paragraphs_ignores_reordering():
+    paragraphs = ["First paragraph.", "Second paragraph."]
+    hashes = [revision_tracker.hash_text(p) for p in paragraphs]
+    assert revision_tracker.diff_paragraphs(hashes, list(reversed(paragraphs))) == ([], [])
+
+def test_diff_paragraphs_recovers_removed_text_from_previous_content():
+    previous = ["Kept paragraph.", "Removed paragraph."]
+    hashes = [revision_tracker.hash_text(p) for p in previous]
+    added, removed = revision_tracker.diff_paragraphs(hashes, ["Kept paragraph.", "New paragraph."], "\n".join(previous))
+    assert added == ["New paragraph."]
+    assert removed == ["Removed paragraph."]
+
+def test_new_article_creates_first_revision():
+    entry = revision_tracker.record_revision(None, make_article(BASE_CONTENT))
+    assert [r['revision'] for r in entry['revisions']] == [1]
+    assert entry['needs_analysis']
+    assert len(entry['paragraph_hashes']) == 4
+
+def test_legacy_cache_entry_is_adopted_as_first_revision():
+    legacy = make_article(BASE_CONTENT, timestamp="2025-06-01T00:00:00")
+    entry = revision_tracker.record_revision(legacy, make_article(BASE_CONTENT))
+    assert len(entry['revisions']) == 1
+    assert entry['revisions'][0]['timestamp'] == "2025-06-01T00:00:00"
+    assert entry['needs_analysis']
+
+def test_unchanged_or_reordered_content_creates_no_revision():
+    entry = analyzed(revision_tracker.record_revision(None, make_article(BASE_CONTENT + "\nFirst tail.\nSecond tail.")))
+    # Gemini に渡す本文冒頭より後ろの段落のみを並べ替える
+    entry = revision_tracker.record_revision(entry, make_article(BASE_CONTENT + "\nSecond tail.\nFirst tail."))
+    assert len(entry['revisions']) == 1
+    assert not entry['needs_analysis']
+
+def test_reorder_within_gemini_excerpt_requires_reanalysis():
+    entry = analyzed(revision_tracker.record_revision(None, make_article(BASE_CONTENT)))
+    paragraphs = BASE_CONTENT.split("\n")
+    reordered = "\n".join([paragraphs[1], paragraphs[0]] + paragraphs[2:])
+    entry = revision_tracker.record_revision(entry, make_article(reordered))
+    latest = entry['revisions'][-1]
+    assert (latest['added_paragraphs'], latest['removed_paragraphs']) == (0, 0)
+    assert latest['excerpt_changed']
+    assert entry['needs_analysis']
+
+def test_whitespace_only_change_creates_no_revision():
+    entry = analyzed(revision_tracker.record_revision(None, make_article(BASE_CONTENT)))
+    entry = revision_tracker.record_revision(entry, make_article(BASE_CONTENT.replace("\n", "\n\n  ")))
+    assert len(entry['revisions']) == 1
+    assert not entry['needs_analysis']
+
+def test_relevant_update_paragraph_requires_reanalysis():
+    entry = analyzed(revision_tracker.record_revision(None, make_article(BASE_CONTENT)))
+    entry = revision_tracker.record_revision(entry, make_article(BASE_CONTENT + "\nUpdate: Microsoft confirmed the bug."))
+    latest = entry['revisions'][-1]
+    assert latest['revision'] == 2
+    assert (latest['added_paragraphs'], latest['removed_paragraphs']) == (1, 0)
+    assert latest['relevant_change']
+    assert latest['added_relevant_preview'] == ["Update: Microsoft confirmed the bug."]
+    assert entry['needs_analysis']
+
+def test_irrelevant_edit_is_recorded_without_reanalysis():
+    entry = analyzed(revision_tracker.record_revision(None, make_article(BASE_CONTENT)))
+    entry = revision_tracker.record_revision(entry, make_article(BASE_CONTENT + "\nThe layout changed slightly."))
+    assert entry['revisions'][-1]['revision'] == 2
+    assert not entry['revisions'][-1]['relevant_change']
+    assert not entry['needs_analysis']
+
+def test_pending_analysis_is_carried_over():
+    entry = revision_tracker.record_revision(None, make_article(BASE_CONTENT))
+    entry = revision_tracker.record_revision(entry, make_article(BASE_CONTENT + "\nShare this article."))
+    assert entry['needs_analysis']
+
+def test_title_change_is_recorded_in_revision():
+    entry = analyzed(revision_tracker.record_revision(None, make_article(BASE_CONTENT)))
+    entry = revision_tracker.record_revision(entry, make_article(BASE_CONTENT, title="Microsoft confirms KB5063060 issues"))
+    latest = entry['revisions'][-1]
+    assert latest['title'] == "Microsoft confirms KB5063060 issues"
+    assert latest['title_changed']
+    assert entry['needs_analysis']
+
+def test_truncated_homepage_title_is_not_a_change():
+    full_title = "Microsoft rushes KB5062324 to fix Windows 11 24H2 issue blocking newer updates"
+    entry = analyzed(revision_tracker.record_revision(None, make_article(BASE_CONTENT, title=full_title)))
+    entry = revision_tracker.record_revision(entry, make_article(BASE_CONTENT, title=full_title[:60] + "…"))
+    assert len(entry['revisions']) == 1
+    assert not entry['needs_analysis']
+
+def test_revision_history_is_trimmed():
+    entry = analyzed(revision_tracker.record_revision(None, make_article(BASE_CONTENT)))
+    for i in range(config.MAX_ARTICLE_REVISIONS + 5):
+        entry = analyzed(revision_tracker.record_revision(entry, make_article(BASE_CONTENT + f"\nFootnote {i}.")))
+    assert len(entry['revisions']) == config.MAX_ARTICLE_REVISIONS
+    assert entry['revisions'][-1]['revision'] == config.MAX_ARTICLE_REVISIONS + 6